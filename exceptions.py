@@ -9,6 +9,10 @@ class UndocumentedStatusError(Exception):
 class WrongResponseCode(Exception):
     """Неверный ответ API."""
 
+    def __init__(self, *args, status_code=None):
+        super().__init__(*args)
+        self.status_code = status_code
+
 
 class EmptyResponseFromAPI(Exception):
     """Пустой ответ API."""
@@ -1,17 +1,23 @@
+import atexit
 import datetime
 import logging
+import logging.handlers
 import os
+import queue
 import sys
 import time
+from collections import OrderedDict
 from http import HTTPStatus
 
 import requests
 import telegram
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from exeptions import (CurrentDateDoesNotExists, EmptyDictionaryOrListError,
-                       NotTelegramError, UndocumentedStatusError,
-                       WrongResponseCode)
+from exceptions import (CurrentDateDoesNotExists, EmptyDictionaryOrListError,
+                        NotTelegramError, UndocumentedStatusError,
+                        WrongResponseCode)
 
 load_dotenv()
 
@@ -20,10 +26,38 @@ TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 
 TIME_FORMAT = "%d-%m-%Y %H:%M"
+NO_TOKENS_MSG = (
+    "Программа принудительно остановлена. "
+    "Отсутствует какой-то из токенов."
+)
 
 RETRY_PERIOD = 60 * 10
+ERROR_RESEND_PERIOD = 60 * 60
+ERROR_CACHE_PERIOD = 60 * 60 * 24
+HOMEWORK_STATUSES_LIMIT = 1024
 ENDPOINT = "https://practicum.yandex.ru/api/user_api/homework_statuses/"
 HEADERS = {"Authorization": f"OAuth {PRACTICUM_TOKEN}"}
+REQUEST_TIMEOUT = (5, 30)
+RESPONSE_TEXT_LIMIT = 512
+API_REQUEST_MSG = "Начало запроса к API. Запрос: %s, %s, %s."
+API_ERROR_MSG = "API не возвращает 200. Запрос: %s, %s, %s."
+SKIPPED_HOMEWORK_MSG = "Не удалось обработать домашнюю работу: %s"
+
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=2,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=1,
+        status_forcelist=(
+            HTTPStatus.INTERNAL_SERVER_ERROR,
+            HTTPStatus.BAD_GATEWAY,
+            HTTPStatus.SERVICE_UNAVAILABLE,
+            HTTPStatus.GATEWAY_TIMEOUT,
+        ),
+    ),
+))
 
 
 HOMEWORK_VERDICTS = {
@@ -31,15 +65,34 @@ HOMEWORK_VERDICTS = {
     "reviewing": "Работа взята на проверку ревьюером.",
     "rejected": "Работа проверена: у ревьюера есть замечания."
 }
+STATUS_MESSAGES = {
+    status: f'Изменился статус проверки работы "%s" {status} {verdict}'
+    for status, verdict in HOMEWORK_VERDICTS.items()
+}
 
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
+
+def configure_logging() -> None:
+    """
+    Настраиваем логирование через очередь.
+    Запись в файл и stdout выполняет фоновый поток QueueListener.
+    """
+    formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
+    handlers = (
         logging.FileHandler("debug.log"),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+        logging.StreamHandler(sys.stdout),
+    )
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers)
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.DEBUG)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener.start()
+    atexit.register(listener.stop)
+
+
+configure_logging()
 logger = logging.getLogger(__name__)
 
 
@@ -51,15 +104,16 @@ def check_tokens():
     return all((PRACTICUM_TOKEN, TELEGRAM_TOKEN, TELEGRAM_CHAT_ID))
 
 
-def send_message(bot: telegram.bot.Bot, message: str) -> None:
-    """Отправляет сообщение в telegram."""
+def send_message(bot: telegram.bot.Bot, message: str) -> bool:
+    """Отправляет сообщение в telegram. Возвращает успешность отправки."""
     try:
         logging.debug("Начало отправки статуса в telegram")
         bot.send_message(chat_id=TELEGRAM_CHAT_ID, text=message)
     except telegram.error.TelegramError as error:
-        logging.error(f"Ошибка отправки статуса в telegram: {error}")
-    else:
-        logging.info("Успешная отправка сообщения!")
+        logging.error("Ошибка отправки статуса в telegram: %s", error)
+        return False
+    logging.info("Успешная отправка сообщения!")
+    return True
 
 
 def get_api_answer(current_timestamp: int) -> dict:
@@ -68,30 +122,26 @@ def get_api_answer(current_timestamp: int) -> dict:
     Также проверяем, что эндпоинт отдает статус 200.
     """
     timestamp = current_timestamp or int(time.time())
-    params_request = {
-        "url": ENDPOINT,
-        "headers": HEADERS,
-        "params": {"from_date": timestamp},
-    }
-    message = (
-        "Начало запроса к API. Запрос: {url}, {headers}, {params}."
-    ).format(**params_request)
-    logging.info(message)
+    params = {"from_date": timestamp}
+    logging.info(API_REQUEST_MSG, ENDPOINT, HEADERS, params)
     try:
-        response = requests.get(**params_request)
+        response = SESSION.get(
+            ENDPOINT, headers=HEADERS, params=params, timeout=REQUEST_TIMEOUT
+        )
         if response.status_code != HTTPStatus.OK:
             raise WrongResponseCode(
                 f"Ответ API не возвращает 200. "
                 f"Код ответа: {response.status_code}. "
                 f"Причина: {response.reason}. "
-                f"Текст: {response.text}."
+                f"Текст: {response.text[:RESPONSE_TEXT_LIMIT]}.",
+                status_code=response.status_code,
             )
         return response.json()
+    except WrongResponseCode:
+        raise
     except Exception as error:
-        message = (
-            "API не возвращает 200. Запрос: {url}, {headers}, {params}."
-        ).format(**params_request)
-        raise WrongResponseCode(message, error)
+        message = API_ERROR_MSG % (ENDPOINT, HEADERS, params)
+        raise WrongResponseCode(message, error) from error
 
 
 def check_response(response: dict):
@@ -102,54 +152,115 @@ def check_response(response: dict):
             f"при получении ответа от api {response} пришёл не словарь "
         )
 
-    if not response.get("current_date"):
+    current_date = response.get("current_date")
+    homework_response = response.get("homeworks")
+    if not current_date:
         raise CurrentDateDoesNotExists("В ответе нет текущей даты")
 
-    homework_response = response.get("homeworks")
+    if homework_response is None:
+        raise EmptyDictionaryOrListError("Нет ключа homeworks в ответе API")
+
     if not isinstance(homework_response, list):
         raise TypeError(
             f"при получении ответа от api {response}"
             f"в словаре нет домашней работы или она не является листом "
         )
-
-    if not homework_response:
-        raise KeyError(f"в {response}  пустой JSON")
-
-    if "homeworks" not in response or "current_date" not in response:
-        raise EmptyDictionaryOrListError("Нет ключа homeworks в ответе API")
     return homework_response
 
 
 def parse_status(homework):
     """Информации о конкретном статусе домашней работы."""
-    homework_name = homework.get('homework_name')
+    if not isinstance(homework, dict):
+        raise TypeError(f'Домашняя работа {homework!r} не является словарём')
     if 'status' not in homework:
         raise KeyError('Статус отсутствует в homeworks')
-    if homework.get('status') not in HOMEWORK_VERDICTS:
-        raise KeyError('В домашней работе нет соответствующего статуса')
+    template = STATUS_MESSAGES.get(homework['status'])
+    if template is None:
+        raise UndocumentedStatusError(
+            f'Неожиданный статус "{homework["status"]}" домашней работы '
+            f'"{homework.get("homework_name")}"'
+        )
     if 'homework_name' not in homework:
         raise KeyError('Имя работы не найдено в домашней работе.')
-    verdict = homework.get('status')
-    homework_name = homework.get('homework_name')
-    message = HOMEWORK_VERDICTS[verdict]
-    if not verdict:
-        raise UndocumentedStatusError('Неожиданный статус домашней работы')
-    return (
-        f'Изменился статус проверки работы "'
-        f'{homework_name}"'
-        f' {verdict}'
-        f' {message}'
+    return template % homework['homework_name']
+
+
+def is_new_error(sent_errors: dict, error: Exception) -> bool:
+    """
+    Проверяем, нужно ли сообщать об ошибке в telegram.
+    Одна и та же ошибка отправляется не чаще раза в ERROR_RESEND_PERIOD.
+    Ошибки различаются по классу, классу причины и коду ответа API.
+    """
+    now = time.time()
+    for key, sent_at in list(sent_errors.items()):
+        if now - sent_at > ERROR_CACHE_PERIOD:
+            del sent_errors[key]
+    cause = error.__cause__
+    key = (
+        type(error).__name__,
+        type(cause).__name__ if cause is not None else None,
+        getattr(error, "status_code", None),
     )
+    if now - sent_errors.get(key, 0) <= ERROR_RESEND_PERIOD:
+        return False
+    sent_errors[key] = now
+    return True
+
+
+def is_new_status(homework_statuses: OrderedDict, homework: dict) -> bool:
+    """Проверяем, изменился ли статус домашней работы."""
+    name, status = homework['homework_name'], homework['status']
+    return homework_statuses.get(name) != status
+
+
+def remember_status(homework_statuses: OrderedDict, homework: dict) -> None:
+    """
+    Запоминаем отправленный статус домашней работы.
+    Хранятся статусы не более HOMEWORK_STATUSES_LIMIT последних работ.
+    """
+    name = homework['homework_name']
+    homework_statuses[name] = homework['status']
+    homework_statuses.move_to_end(name)
+    if len(homework_statuses) > HOMEWORK_STATUSES_LIMIT:
+        homework_statuses.popitem(last=False)
+
+
+def collect_updates(homework_statuses: OrderedDict, homeworks: list) -> list:
+    """
+    Собираем сообщения о домашних работах с изменившимся статусом.
+    О некорректных работах сообщаем отдельной строкой, не теряя остальные.
+    """
+    updates = []
+    for homework in homeworks:
+        try:
+            message = parse_status(homework)
+        except (KeyError, TypeError, UndocumentedStatusError) as error:
+            logger.error('Пропущена некорректная домашняя работа: %s', error)
+            updates.append((None, SKIPPED_HOMEWORK_MSG % error))
+            continue
+        if is_new_status(homework_statuses, homework):
+            updates.append((homework, message))
+    return updates
+
+
+def send_updates(bot: telegram.bot.Bot, homework_statuses: OrderedDict,
+                 updates: list) -> bool:
+    """
+    Отправляем собранные сообщения в telegram одним сообщением.
+    Статусы запоминаем только после успешной отправки.
+    """
+    if not send_message(bot, '\n\n'.join(msg for _, msg in updates)):
+        return False
+    for homework, _ in updates:
+        if homework is not None:
+            remember_status(homework_statuses, homework)
+    return True
 
 
 def main():
     """Главная функция запуска бота."""
     if not check_tokens():
-        no_tokens_msg = (
-            "Программа принудительно остановлена. "
-            "Отсутствует какой-то из токенов."
-        )
-        logging.critical(no_tokens_msg)
+        logging.critical(NO_TOKENS_MSG)
         sys.exit("Отсутствует обязательная переменная окружения")
 
     bot = telegram.Bot(token=TELEGRAM_TOKEN)
@@ -158,32 +269,27 @@ def main():
         bot,
         f"Я начал свою работу: {now.strftime(TIME_FORMAT)}")
     timestamp = int(time.time())
-    preview_api_response = None
+    homework_statuses = OrderedDict()
+    sent_errors = {}
     while True:
         try:
             response = get_api_answer(timestamp)
-            timestamp = response.get('current_date')
             homeworks = check_response(response)
-            if homeworks:
-                homework = homeworks[0]
-                message = parse_status(homework)
-                current_api_answer = homework
-                if current_api_answer != preview_api_response:
-                    send_message(bot, message)
-                    preview_api_response = current_api_answer
-                    logging.info(
-                        'Новое домашнее задание не появилось или не изменилось'
-                    )
-            else:
+            updates = collect_updates(homework_statuses, homeworks)
+            if not updates:
                 logger.debug('Новых статусов нет')
+                timestamp = response.get('current_date')
+            elif send_updates(bot, homework_statuses, updates):
+                timestamp = response.get('current_date')
         except NotTelegramError as error:
             logging.error(
-                f'Что то сломалось при отправке,{error}',
+                'Что то сломалось при отправке,%s', error,
                 exc_info=True
             )
         except Exception as error:
             message = f'Сбой в работе программы: {error}'
-            send_message(bot, message)
+            if is_new_error(sent_errors, error):
+                send_message(bot, message)
             logging.error(message, exc_info=error)
         finally:
             time.sleep(RETRY_PERIOD)
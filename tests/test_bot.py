@@ -191,7 +191,11 @@ class TestHomework:
                     'Проверьте, что в параметре `from_date` передано число.'
                 )
 
-        monkeypatch.setattr(requests, 'get', check_request_get_call)
+        monkeypatch.setattr(
+            homework_module.SESSION,
+            'get',
+            check_request_get_call
+        )
         try:
             homework_module.get_api_answer(current_timestamp)
         except AssertionError as e:
@@ -214,7 +218,11 @@ class TestHomework:
                 current_timestamp=current_timestamp, **kwargs
             )
 
-        monkeypatch.setattr(requests, 'get', mock_response_get)
+        monkeypatch.setattr(
+            homework_module.SESSION,
+            'get',
+            mock_response_get
+        )
 
         result = homework_module.get_api_answer(current_timestamp)
         assert isinstance(result, dict), (
@@ -234,7 +242,11 @@ class TestHomework:
             self.HOMEWORK_FUNC_WITH_PARAMS_QTY[func_name]
         )
 
-        monkeypatch.setattr(requests, 'get', response)
+        monkeypatch.setattr(
+            homework_module.SESSION,
+            'get',
+            response
+        )
         try:
             homework_module.get_api_answer(current_timestamp)
         except Exception:
@@ -245,6 +257,50 @@ class TestHomework:
                 'ситуация, когда API домашки возвращает код, отличный от 200.'
             )
 
+    def test_session_retries_transient_errors(self, homework_module):
+        adapter = homework_module.SESSION.get_adapter(
+            homework_module.ENDPOINT
+        )
+        retries = adapter.max_retries
+        assert retries.total == 3, (
+            'Убедитесь, что запросы к API домашки повторяются до трёх раз.'
+        )
+        for status in (500, 502, 503, 504):
+            assert status in retries.status_forcelist, (
+                'Убедитесь, что запрос к API домашки повторяется при '
+                f'ответе с кодом {status}.'
+            )
+
+    def test_get_not_200_response_text_is_truncated(self, monkeypatch,
+                                                    current_timestamp,
+                                                    homework_module):
+        limit = homework_module.RESPONSE_TEXT_LIMIT
+        long_text = 'x' * (limit + 100)
+
+        def mock_response_get(*args, **kwargs):
+            response = utils.MockResponseGET(
+                *args, http_status=HTTPStatus.BAD_REQUEST, **kwargs
+            )
+            response.text = long_text
+            return response
+
+        monkeypatch.setattr(
+            homework_module.SESSION,
+            'get',
+            mock_response_get
+        )
+        with pytest.raises(homework_module.WrongResponseCode) as exc_info:
+            homework_module.get_api_answer(current_timestamp)
+        message = str(exc_info.value)
+        assert 'x' * limit in message and 'x' * (limit + 1) not in message, (
+            'Убедитесь, что текст ответа API в исключении обрезается до '
+            '`RESPONSE_TEXT_LIMIT` символов.'
+        )
+        assert exc_info.value.status_code == HTTPStatus.BAD_REQUEST, (
+            'Убедитесь, что в исключении `WrongResponseCode` сохраняется '
+            'код ответа API.'
+        )
+
     def test_get_api_answer_with_request_exception(self, current_timestamp,
                                                    monkeypatch,
                                                    homework_module):
@@ -258,7 +314,11 @@ class TestHomework:
         def mock_request_get_with_exception(*args, **kwargs):
             raise requests.RequestException('Something wrong')
 
-        monkeypatch.setattr(requests, 'get', mock_request_get_with_exception)
+        monkeypatch.setattr(
+            homework_module.SESSION,
+            'get',
+            mock_request_get_with_exception
+        )
         try:
             homework_module.get_api_answer(current_timestamp)
         except requests.RequestException:
@@ -398,6 +458,19 @@ class TestHomework:
                 f'`{func_name}` не вызывает исключений.'
             )
 
+    def test_check_response_empty_homeworks(self, random_timestamp,
+                                            homework_module):
+        empty_response = {
+            'homeworks': [],
+            'current_date': random_timestamp
+        }
+        result = homework_module.check_response(empty_response)
+        assert result == [], (
+            'Убедитесь, что при пустом списке `homeworks` функция '
+            '`check_response` возвращает пустой список, а не выбрасывает '
+            'исключение.'
+        )
+
     @pytest.mark.parametrize('response', INVALID_RESPONSES.values())
     def test_check_invalid_response(self, response, homework_module):
         func_name = 'check_response'
@@ -586,7 +659,11 @@ class TestHomework:
                 current_timestamp=current_timestamp, **kwargs
             )
 
-        monkeypatch.setattr(requests, 'get', mock_response_get)
+        monkeypatch.setattr(
+            homework_module.SESSION,
+            'get',
+            mock_response_get
+        )
 
     def test_main_without_env_vars_raise_exception(
             self, caplog, monkeypatch, random_timestamp, current_timestamp,
@@ -640,7 +717,7 @@ class TestHomework:
                     if record.message == utils.MockResponseGET.CALLED_LOG_MSG
                 ]
                 assert log_record, (
-                    'Убедитесь, что бот использует функцию `requests.get()` '
+                    'Убедитесь, что бот использует метод `SESSION.get()` '
                     'для отправки запроса к API домашки.'
                 )
 
@@ -723,7 +800,7 @@ class TestHomework:
                 data=data_with_new_hw_status
             ))
         monkeypatch.setattr(
-            requests,
+            homework_module.SESSION,
             'get',
             mock_response_get_with_new_status
         )
@@ -752,6 +829,254 @@ class TestHomework:
                     'из переменной `HOMEWORK_VERDICTS`.'
                 )
 
+    def test_main_sends_all_changed_homeworks_in_one_message(
+            self, monkeypatch, random_timestamp, current_timestamp,
+            random_message, caplog, homework_module
+    ):
+        self.mock_main(
+            monkeypatch,
+            random_message,
+            random_timestamp,
+            current_timestamp,
+            homework_module
+        )
+        homework_module.PRACTICUM_TOKEN = 'sometoken'
+        homework_module.TELEGRAM_TOKEN = '1234:abcdefg'
+        homework_module.TELEGRAM_CHAT_ID = '12345'
+        data_with_several_homeworks = {
+            'homeworks': [
+                {'homework_name': 'hw1', 'status': 'approved'},
+                {'homework_name': 'hw2', 'status': 'unknown'},
+                {'homework_name': 'hw3', 'status': 'rejected'},
+            ],
+            'current_date': random_timestamp
+        }
+        monkeypatch.setattr(
+            homework_module.SESSION,
+            'get',
+            create_mock_response_get_with_custom_status_and_data(
+                random_timestamp=random_timestamp,
+                http_status=HTTPStatus.OK,
+                data=data_with_several_homeworks
+            )
+        )
+        sent_messages = []
+
+        def mock_send_message(bot, message=''):
+            if message.startswith('Изменился статус'):
+                sent_messages.append(message)
+            return True
+
+        monkeypatch.setattr(
+            homework_module,
+            'send_message',
+            mock_send_message
+        )
+        try:
+            homework_module.main()
+        except utils.BreakInfiniteLoop:
+            pass
+        assert len(sent_messages) == 1, (
+            'Убедитесь, что все изменившиеся статусы из одного ответа API '
+            'отправляются в Telegram одним сообщением.'
+        )
+        for status in ('approved', 'rejected'):
+            assert self.HOMEWORK_VERDICTS[status] in sent_messages[0], (
+                'Убедитесь, что некорректная домашняя работа в ответе API '
+                'не мешает отправке статусов остальных работ.'
+            )
+
+    def test_main_notifies_about_malformed_homework(
+            self, monkeypatch, random_timestamp, current_timestamp,
+            random_message, homework_module
+    ):
+        self.mock_main(
+            monkeypatch,
+            random_message,
+            random_timestamp,
+            current_timestamp,
+            homework_module
+        )
+        homework_module.PRACTICUM_TOKEN = 'sometoken'
+        homework_module.TELEGRAM_TOKEN = '1234:abcdefg'
+        homework_module.TELEGRAM_CHAT_ID = '12345'
+        monkeypatch.setattr(
+            homework_module.SESSION,
+            'get',
+            create_mock_response_get_with_custom_status_and_data(
+                random_timestamp=random_timestamp,
+                http_status=HTTPStatus.OK,
+                data={
+                    'homeworks': [
+                        {'homework_name': 'hw_new', 'status': 'new_status'},
+                    ],
+                    'current_date': random_timestamp
+                }
+            )
+        )
+        sent_messages = []
+
+        def mock_send_message(bot, message=''):
+            sent_messages.append(message)
+            return True
+
+        monkeypatch.setattr(
+            homework_module,
+            'send_message',
+            mock_send_message
+        )
+        try:
+            homework_module.main()
+        except utils.BreakInfiniteLoop:
+            pass
+        assert any(
+            'hw_new' in message and 'new_status' in message
+            for message in sent_messages
+        ), (
+            'Убедитесь, что о домашней работе с недокументированным '
+            'статусом сообщается в Telegram.'
+        )
+
+    def test_collect_updates_skips_malformed_homework(self, homework_module):
+        homework_statuses = homework_module.OrderedDict()
+        homeworks = [
+            {'homework_name': 'hw1', 'status': 'approved'},
+            {'homework_name': 'hw2', 'status': 'unknown'},
+        ]
+        updates = homework_module.collect_updates(homework_statuses, homeworks)
+        assert [homework for homework, _ in updates] == [homeworks[0], None], (
+            'Убедитесь, что корректные домашние работы попадают в сообщение, '
+            'а о некорректной сообщается отдельной строкой.'
+        )
+        assert 'hw2' in updates[1][1], (
+            'Убедитесь, что в сообщении о некорректной домашней работе '
+            'указано её название.'
+        )
+        assert not homework_statuses, (
+            'Убедитесь, что статусы запоминаются только после успешной '
+            'отправки сообщения.'
+        )
+
+    def test_collect_updates_skips_not_dict_homework(self, homework_module):
+        homework_statuses = homework_module.OrderedDict()
+        homeworks = [
+            {'homework_name': 'hw1', 'status': 'approved'},
+            None,
+        ]
+        try:
+            updates = homework_module.collect_updates(
+                homework_statuses, homeworks
+            )
+        except TypeError:
+            raise AssertionError(
+                'Убедитесь, что элемент `homeworks`, не являющийся словарём, '
+                'не прерывает обработку остальных домашних работ.'
+            )
+        assert [homework for homework, _ in updates] == [homeworks[0], None], (
+            'Убедитесь, что корректные домашние работы попадают в сообщение, '
+            'а о некорректной сообщается отдельной строкой.'
+        )
+
+    def test_is_new_status_same_status_not_resent(self, homework_module):
+        homework_statuses = homework_module.OrderedDict()
+        homework = {'homework_name': 'hw1', 'status': 'reviewing'}
+        assert homework_module.is_new_status(homework_statuses, homework), (
+            'Убедитесь, что о новой домашней работе сообщается в Telegram.'
+        )
+        homework_module.remember_status(homework_statuses, homework)
+        assert not homework_module.is_new_status(
+            homework_statuses, homework
+        ), (
+            'Убедитесь, что неизменившийся статус не отправляется повторно.'
+        )
+
+    def test_is_new_status_changed_status_sent(self, homework_module):
+        homework_statuses = homework_module.OrderedDict()
+        homework_module.remember_status(
+            homework_statuses, {'homework_name': 'hw1', 'status': 'reviewing'}
+        )
+        homework_module.remember_status(
+            homework_statuses, {'homework_name': 'hw2', 'status': 'reviewing'}
+        )
+        assert homework_module.is_new_status(
+            homework_statuses, {'homework_name': 'hw1', 'status': 'approved'}
+        ), (
+            'Убедитесь, что изменившийся статус домашней работы '
+            'отправляется в Telegram.'
+        )
+
+    def test_remember_status_evicts_oldest(self, monkeypatch,
+                                          homework_module):
+        monkeypatch.setattr(homework_module, 'HOMEWORK_STATUSES_LIMIT', 2)
+        homework_statuses = homework_module.OrderedDict()
+        for name in ('hw1', 'hw2'):
+            homework_module.remember_status(
+                homework_statuses,
+                {'homework_name': name, 'status': 'reviewing'}
+            )
+        homework_module.remember_status(
+            homework_statuses, {'homework_name': 'hw1', 'status': 'approved'}
+        )
+        homework_module.remember_status(
+            homework_statuses, {'homework_name': 'hw3', 'status': 'reviewing'}
+        )
+        assert list(homework_statuses) == ['hw1', 'hw3'], (
+            'Убедитесь, что при превышении `HOMEWORK_STATUSES_LIMIT` '
+            'удаляется статус работы, которая дольше всех не обновлялась.'
+        )
+
+    @staticmethod
+    def make_api_error(homework_module, current_date, cause=None,
+                       status_code=None):
+        error = homework_module.WrongResponseCode(
+            f'Ошибка запроса, current_date={current_date}',
+            status_code=status_code
+        )
+        error.__cause__ = cause
+        return error
+
+    def test_is_new_error_holds_back_repeated_error(self, homework_module):
+        sent_errors = {}
+        first = self.make_api_error(homework_module, 1, status_code=502)
+        repeated = self.make_api_error(homework_module, 2, status_code=502)
+        assert homework_module.is_new_error(sent_errors, first), (
+            'Убедитесь, что о первой ошибке сообщается в Telegram.'
+        )
+        assert not homework_module.is_new_error(sent_errors, repeated), (
+            'Убедитесь, что повторная ошибка не отправляется в Telegram '
+            'чаще раза в `ERROR_RESEND_PERIOD`.'
+        )
+        assert len(sent_errors) == 1
+
+    def test_is_new_error_sends_different_error(self, homework_module):
+        sent_errors = {}
+        errors = (
+            self.make_api_error(homework_module, 1, status_code=502),
+            self.make_api_error(homework_module, 2, status_code=401),
+            self.make_api_error(
+                homework_module, 3, cause=requests.Timeout('timeout')
+            ),
+            self.make_api_error(
+                homework_module, 4, cause=ValueError('bad json')
+            ),
+        )
+        for error in errors:
+            assert homework_module.is_new_error(sent_errors, error), (
+                'Убедитесь, что ошибка другого вида отправляется в Telegram, '
+                'даже если недавно была отправлена другая ошибка.'
+            )
+
+    def test_is_new_error_resends_after_period(self, homework_module):
+        error = self.make_api_error(homework_module, 1, status_code=502)
+        sent_errors = {}
+        homework_module.is_new_error(sent_errors, error)
+        for key in sent_errors:
+            sent_errors[key] -= homework_module.ERROR_RESEND_PERIOD + 1
+        assert homework_module.is_new_error(sent_errors, error), (
+            'Убедитесь, что ошибка снова отправляется в Telegram после '
+            '`ERROR_RESEND_PERIOD`.'
+        )
+
     def test_docstrings(self, homework_module):
         for func in self.HOMEWORK_FUNC_WITH_PARAMS_QTY:
             utils.check_docstring(homework_module, func)